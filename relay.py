@@ -13,7 +13,7 @@ Other notes:
 """
 
 from __future__ import annotations
-import os, sys, subprocess, json, time, uuid, threading, base64, shutil, socket, ssl, re, math, hashlib
+import os, sys, subprocess, json, time, uuid, threading, base64, shutil, socket, ssl, math, hashlib, functools, itertools
 from pathlib import Path
 from typing import Any, Dict, Optional, List, Tuple
 from datetime import datetime, timezone, timedelta
@@ -65,6 +65,81 @@ _ensure_venv_and_reexec()
 # ─────────────────────────────────────────────────────────────────────────────
 # 1) First-run deps and sidecar
 # ─────────────────────────────────────────────────────────────────────────────
+# keep sidecar minimal; seed persistence is handled in Python before launch.
+# IPC framing (both directions): <u32le head_len><head JSON><u32le body_len><body bytes>
+SIDECAR_SRC = r"""
+const { MultiClient } = require('nkn-sdk');
+// stdout carries binary frames only; route any stray console output to stderr
+console.log = console.info = console.warn = console.debug = console.error;
+function writeFrame(obj, body){
+  try {
+    const head = Buffer.from(JSON.stringify(obj));
+    const b = body || Buffer.alloc(0);
+    const hl = Buffer.alloc(4); hl.writeUInt32LE(head.length, 0);
+    const bl = Buffer.alloc(4); bl.writeUInt32LE(b.length, 0);
+    process.stdout.write(Buffer.concat([hl, head, bl, b]));
+  } catch {}
+}
+(async () => {
+  const identifier = (process.env.NKN_IDENTIFIER || 'forwarder').trim();
+  const seed = (process.env.NKN_SEED || '').trim() || undefined;
+  const numSubClients = Math.max(1, parseInt(process.env.NKN_SUBCLIENTS || '4', 10));
+  const rpcStr = (process.env.NKN_RPC_ADDRS || '').trim();
+  const rpcServerAddr = rpcStr ? rpcStr.split(',').map(s=>s.trim()).filter(Boolean) : undefined;
+  const seedRpcServerAddr = (process.env.NKN_SEED_RPC_ADDRS || '').split(',').map(s=>s.trim()).filter(Boolean);
+  const seedWsAddr = (process.env.NKN_SEED_WS_ADDRS || '').split(',').map(s=>s.trim()).filter(Boolean);
+  const responseTimeout = Math.max(5000, parseInt(process.env.NKN_RESPONSE_TIMEOUT_MS || '20000', 10) || 20000);
+  const msgHoldingSeconds = Math.max(30, parseInt(process.env.NKN_MSG_HOLDING_S || '90', 10) || 90);
+  const wsConnHeartbeatTimeout = Math.max(30000, parseInt(process.env.NKN_WS_HEARTBEAT_MS || '120000', 10) || 120000);
+  let mc;
+  try { mc = new MultiClient({
+      identifier,
+      seed,
+      numSubClients,
+      originalClient: false,
+      rpcServerAddr,
+      seedRpcServerAddr: seedRpcServerAddr.length ? seedRpcServerAddr : undefined,
+      seedWsAddr: seedWsAddr.length ? seedWsAddr : undefined,
+      tls: true,
+      responseTimeout,
+      msgHoldingSeconds,
+      msgCacheExpiration: 300000,
+      reconnectIntervalMin: 1000,
+      reconnectIntervalMax: 8000,
+      wsConnHeartbeatTimeout
+    }); }
+  catch (e) { writeFrame({ ev:"error", message: String(e && e.message || e) }); process.exit(1); }
+  mc.onConnect(() => writeFrame({ ev:"ready", addr: mc.addr }));
+  mc.onMessage(({ src, payload }) => {
+    try { writeFrame({ ev:"message", src }, Buffer.from(payload)); }
+    catch (e) { writeFrame({ ev:"error", message: "onMessage decode: "+(e && e.message || e) }); }
+  });
+  async function onCommand(msg, body) {
+    if (msg.op === 'send') {
+      try { const dest = String(msg.dest || '').trim(); if (!dest) return writeFrame({ ev:"error", message:"missing dest", id: msg.id });
+        await mc.send(dest, body); writeFrame({ ev:"sent", id: msg.id, dest }); }
+      catch (e) { writeFrame({ ev:"error", id: msg.id, message: String(e && e.message || e) }); }
+    } else if (msg.op === 'close') { try { await mc.close(); } catch {} process.exit(0); }
+  }
+  let pending = Buffer.alloc(0);
+  process.stdin.on('data', (chunk) => {
+    pending = pending.length ? Buffer.concat([pending, chunk]) : chunk;
+    while (pending.length >= 4) {
+      const hl = pending.readUInt32LE(0);
+      if (pending.length < 8 + hl) break;
+      const end = 8 + hl + pending.readUInt32LE(4 + hl);
+      if (pending.length < end) break;
+      let msg = null; try { msg = JSON.parse(pending.toString('utf8', 4, 4 + hl)); } catch {}
+      const body = pending.subarray(8 + hl, end);
+      pending = pending.subarray(end);
+      if (msg) onCommand(msg, body);
+    }
+  });
+  process.on('SIGINT', async ()=>{ try{ await mc.close(); }catch{} process.exit(0); });
+  process.on('SIGTERM', async ()=>{ try{ await mc.close(); }catch{} process.exit(0); });
+})();
+"""
+
 if SETUP_MKR.exists():
     missing = []
     if not SIDE_DIR.is_dir(): missing.append("sidecar/")
@@ -75,13 +150,17 @@ if SETUP_MKR.exists():
         print(f"[WARN] Missing sidecar assets ({', '.join(missing)}); re-running setup.", flush=True)
         try: SETUP_MKR.unlink()
         except FileNotFoundError: pass
+    elif SIDECAR_JS.read_text(encoding="utf-8") != SIDECAR_SRC:
+        # the sidecar is only written at setup; refresh it when the bridge protocol changes
+        SIDECAR_JS.write_text(SIDECAR_SRC, encoding="utf-8")
+        print("[PROCESS] Updated sidecar/sidecar.js to the current bridge protocol.", flush=True)
 
 def _pip(*pkgs): subprocess.check_call([sys.executable, "-m", "pip", "install", *pkgs])
 
 if not SETUP_MKR.exists():
     print("[PROCESS] Installing Python dependencies…", flush=True)
     _pip("--upgrade", "pip")
-    _pip("flask", "flask-cors", "python-dotenv", "requests", "waitress", "cryptography")
+    _pip("flask", "flask-cors", "python-dotenv", "urllib3", "waitress", "cryptography", "numpy", "orjson")
 
     # Write default .env
     env_path = SCRIPT_DIR / ".env"
@@ -90,14 +169,29 @@ if not SETUP_MKR.exists():
             "FORWARD_BIND=0.0.0.0\n"
             "FORWARD_PORT=9011\n"
             "FORWARD_FORCE_LOCAL=0\n"
+            "# FORWARD_REUSEPORT=1 lets several relays share FORWARD_PORT. Each process needs its own\n"
+            "# NKN_SEED_FILE (or NKN_IDENTIFIER): with the shared seed they get the same NKN address\n"
+            "# and /forward replies land in the wrong process.\n"
+            "FORWARD_REUSEPORT=0\n"
             "FORWARD_CONCURRENCY=4\n"
             "FORWARD_RATE_RPS=6\n"
             "FORWARD_RATE_BURST=12\n"
+            "FORWARD_GH_CACHE=65536\n"
+            "FORWARD_MAX_POINTS=1024\n"
+            "FORWARD_BATCH_WINDOW_MS=10\n"
+            "FORWARD_BATCH_MAX=100\n"
+            "FORWARD_DM_WORKERS=16\n"
+            "FORWARD_SERVER=waitress\n"
+            "FORWARD_WAITRESS_THREADS=\n"         # empty = max(8, 2*FORWARD_CONCURRENCY)
+            "FORWARD_WAITRESS_CONN_LIMIT=1024\n"
+            "FORWARD_WAITRESS_BACKLOG=2048\n"
+            "FORWARD_CHANNEL_TIMEOUT=120\n"
             "\n"
             "FORWARD_SSL=0\n"
             "FORWARD_SSL_CERT=tls/cert.pem\n"
             "FORWARD_SSL_KEY=tls/key.pem\n"
             "FORWARD_SSL_REFRESH=0\n"
+            "FORWARD_SSL_MIN=1.2\n"
             "FORWARD_SSL_EXTRA_DNS_SANS=\n"
             "\n"
             "ELEV_BASE=http://localhost:5000\n"
@@ -115,6 +209,7 @@ if not SETUP_MKR.exists():
             "NKN_SEND_QUEUE_MAX=256\n"
             "NKN_RPC_ADDRS=\n"
             "DM_CHUNK_LIMIT_BYTES=1024\n"
+            "LOG_LEVEL=INFO\n"
         )
         print("[SUCCESS] Wrote .env with defaults.", flush=True)
 
@@ -125,60 +220,7 @@ if not SETUP_MKR.exists():
     if not SIDECAR_PKG.exists():
         subprocess.check_call(["npm", "init", "-y"], cwd=str(SIDE_DIR))
 
-    # keep sidecar minimal; seed persistence is handled in Python before launch
-    SIDECAR_JS.write_text(r"""
-const readline = require('readline');
-const { MultiClient } = require('nkn-sdk');
-function ndj(obj){ try{ process.stdout.write(JSON.stringify(obj)+"\n"); }catch{} }
-(async () => {
-  const identifier = (process.env.NKN_IDENTIFIER || 'forwarder').trim();
-  const seed = (process.env.NKN_SEED || '').trim() || undefined;
-  const numSubClients = Math.max(1, parseInt(process.env.NKN_SUBCLIENTS || '4', 10));
-  const rpcStr = (process.env.NKN_RPC_ADDRS || '').trim();
-  const rpcServerAddr = rpcStr ? rpcStr.split(',').map(s=>s.trim()).filter(Boolean) : undefined;
-  const seedRpcServerAddr = (process.env.NKN_SEED_RPC_ADDRS || '').split(',').map(s=>s.trim()).filter(Boolean);
-  const seedWsAddr = (process.env.NKN_SEED_WS_ADDRS || '').split(',').map(s=>s.trim()).filter(Boolean);
-  const responseTimeout = Math.max(5000, parseInt(process.env.NKN_RESPONSE_TIMEOUT_MS || '20000', 10) || 20000);
-  const msgHoldingSeconds = Math.max(30, parseInt(process.env.NKN_MSG_HOLDING_S || '90', 10) || 90);
-  const wsConnHeartbeatTimeout = Math.max(30000, parseInt(process.env.NKN_WS_HEARTBEAT_MS || '120000', 10) || 120000);
-  let mc;
-  try { mc = new MultiClient({
-      identifier,
-      seed,
-      numSubClients,
-      originalClient: false,
-      rpcServerAddr,
-      seedRpcServerAddr: seedRpcServerAddr.length ? seedRpcServerAddr : undefined,
-      seedWsAddr: seedWsAddr.length ? seedWsAddr : undefined,
-      tls: true,
-      responseTimeout,
-      msgHoldingSeconds,
-      msgCacheExpiration: 300000,
-      reconnectIntervalMin: 1000,
-      reconnectIntervalMax: 8000,
-      wsConnHeartbeatTimeout
-    }); }
-  catch (e) { ndj({ ev:"error", message: String(e && e.message || e) }); process.exit(1); }
-  mc.onConnect(() => ndj({ ev:"ready", addr: mc.addr }));
-  mc.onMessage(({ src, payload }) => {
-    try { const buf = (typeof payload === 'string') ? Buffer.from(payload) : Buffer.from(payload);
-      ndj({ ev:"message", src, payload_b64: buf.toString('base64') }); }
-    catch (e) { ndj({ ev:"error", message: "onMessage decode: "+(e && e.message || e) }); }
-  });
-  const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
-  rl.on('line', async (line) => {
-    let msg; try { msg = JSON.parse(line); } catch { return; }
-    if (msg.op === 'send') {
-      try { const dest = String(msg.dest || '').trim(); if (!dest) return ndj({ ev:"error", message:"missing dest", id: msg.id });
-        const data = msg.payload_b64 ? Buffer.from(msg.payload_b64, 'base64') : Buffer.alloc(0);
-        await mc.send(dest, data); ndj({ ev:"sent", id: msg.id, dest }); }
-      catch (e) { ndj({ ev:"error", id: msg.id, message: String(e && e.message || e) }); }
-    } else if (msg.op === 'close') { try { await mc.close(); } catch {} process.exit(0); }
-  });
-  process.on('SIGINT', async ()=>{ try{ await mc.close(); }catch{} process.exit(0); });
-  process.on('SIGTERM', async ()=>{ try{ await mc.close(); }catch{} process.exit(0); });
-})();
-""")
+    SIDECAR_JS.write_text(SIDECAR_SRC, encoding="utf-8")
 
     print("[PROCESS] Installing Node sidecar dependency (nkn-sdk)…", flush=True)
     subprocess.check_call(["npm", "install", "nkn-sdk@latest", "--no-fund", "--silent"], cwd=str(SIDE_DIR))
@@ -190,24 +232,48 @@ function ndj(obj){ try{ process.stdout.write(JSON.stringify(obj)+"\n"); }catch{}
 # ─────────────────────────────────────────────────────────────────────────────
 # 2) Runtime deps & env
 # ─────────────────────────────────────────────────────────────────────────────
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 from dotenv import load_dotenv
-import requests
+import urllib3
+from urllib.parse import unquote
+try:
+    import numpy as np
+except ImportError:  # optional: batch geohash decode falls back to the scalar path
+    np = None
+try:
+    import orjson
+    _dumps = orjson.dumps   # compact separators, returns bytes
+    _loads = orjson.loads
+except ImportError:  # optional: stdlib json with the same signatures
+    def _dumps(obj: Any) -> bytes: return json.dumps(obj, separators=(",",":")).encode()
+    _loads = json.loads
 
 load_dotenv(SCRIPT_DIR / ".env")
 
 FORWARD_BIND        = os.getenv("FORWARD_BIND", "0.0.0.0")
 FORWARD_PORT        = int(os.getenv("FORWARD_PORT", "9011"))
 FORWARD_FORCE_LOCAL = os.getenv("FORWARD_FORCE_LOCAL", "0") == "1"
+FORWARD_REUSEPORT   = os.getenv("FORWARD_REUSEPORT", "0") == "1"   # share the port with other relay processes
 FORWARD_CONCURRENCY = max(1, min(4, int(os.getenv("FORWARD_CONCURRENCY", "4"))))
 FORWARD_RATE_RPS    = max(1, min(6, int(os.getenv("FORWARD_RATE_RPS", "6"))))
 FORWARD_RATE_BURST  = max(1, min(12, int(os.getenv("FORWARD_RATE_BURST", "12"))))
+FORWARD_GH_CACHE    = max(0, int(os.getenv("FORWARD_GH_CACHE", "65536")))  # decoded geohashes kept; 0 = off
+FORWARD_MAX_POINTS  = max(1, int(os.getenv("FORWARD_MAX_POINTS", "1024")))  # per query, checked before decoding
+FORWARD_BATCH_WINDOW_MS = max(0, int(os.getenv("FORWARD_BATCH_WINDOW_MS", "10")))  # upstream coalescing window; 0 = off
+FORWARD_BATCH_MAX   = max(1, int(os.getenv("FORWARD_BATCH_MAX", "100")))  # points per merged upstream GET
+FORWARD_DM_WORKERS  = max(1, int(os.getenv("FORWARD_DM_WORKERS", "16")))   # DMs handled concurrently
+FORWARD_SERVER      = (os.getenv("FORWARD_SERVER", "waitress") or "waitress").strip().lower()  # waitress | uvicorn | hypercorn
+FORWARD_WAITRESS_THREADS    = max(1, int(os.getenv("FORWARD_WAITRESS_THREADS") or max(8, FORWARD_CONCURRENCY*2)))
+FORWARD_WAITRESS_CONN_LIMIT = max(1, int(os.getenv("FORWARD_WAITRESS_CONN_LIMIT", "1024")))
+FORWARD_WAITRESS_BACKLOG    = max(1, int(os.getenv("FORWARD_WAITRESS_BACKLOG", "2048")))
+FORWARD_CHANNEL_TIMEOUT     = max(1, int(os.getenv("FORWARD_CHANNEL_TIMEOUT", "120")))  # idle keep-alive seconds
 
 FORWARD_SSL_MODE    = (os.getenv("FORWARD_SSL", "0") or "0").lower()
 FORWARD_SSL_CERT    = os.getenv("FORWARD_SSL_CERT", "tls/cert.pem")
 FORWARD_SSL_KEY     = os.getenv("FORWARD_SSL_KEY",  "tls/key.pem")
 FORWARD_SSL_REFRESH = os.getenv("FORWARD_SSL_REFRESH","0") == "1"
+FORWARD_SSL_MIN     = (os.getenv("FORWARD_SSL_MIN", "1.2") or "1.2").strip()   # 1.2 | 1.3
 FORWARD_SSL_SANS    = [s.strip() for s in os.getenv("FORWARD_SSL_EXTRA_DNS_SANS","").split(",") if s.strip()]
 
 ELEV_BASE           = os.getenv("ELEV_BASE", "http://localhost:5000").rstrip("/")
@@ -216,6 +282,7 @@ ELEV_TIMEOUT_MS     = int(os.getenv("ELEV_TIMEOUT_MS", "10000"))
 
 NKN_IDENTIFIER      = os.getenv("NKN_IDENTIFIER", "forwarder")
 NKN_SEED            = os.getenv("NKN_SEED", "").strip()
+_NKN_SEED_GIVEN     = bool(NKN_SEED)   # set by the user, not filled in from NKN_SEED_FILE later
 NKN_SEED_FILE       = os.getenv("NKN_SEED_FILE", "sidecar/nkn.seed").strip()  # ⬅ added
 NKN_SUBCLIENTS      = max(1, min(8, int(os.getenv("NKN_SUBCLIENTS", "8"))))
 NKN_RPC_ADDRS       = [s.strip() for s in os.getenv("NKN_RPC_ADDRS","").split(",") if s.strip()]
@@ -228,6 +295,8 @@ NKN_SEND_QUEUE_MAX     = max(32, int(os.getenv("NKN_SEND_QUEUE_MAX", "256")))
 NKN_SEED_RPC_ADDRS     = [s.strip() for s in os.getenv("NKN_SEED_RPC_ADDRS", "").split(",") if s.strip()]
 NKN_SEED_WS_ADDRS      = [s.strip() for s in os.getenv("NKN_SEED_WS_ADDRS", "").split(",") if s.strip()]
 
+LOG_LEVEL           = (os.getenv("LOG_LEVEL", "INFO") or "INFO").strip().upper()   # INFO | SUCCESS | WARN | ERR
+
 TLS_DIR             = SCRIPT_DIR / "tls"
 TLS_DIR.mkdir(exist_ok=True, parents=True)
 
@@ -291,7 +360,15 @@ process.stdout.write(s);
 # 3) Small logging, rate limit, semaphore
 # ─────────────────────────────────────────────────────────────────────────────
 CLR = {"RESET":"\033[0m","INFO":"\033[94m","SUCCESS":"\033[92m","WARN":"\033[93m","ERR":"\033[91m"}
+_LOG_LEVELS = {"INFO": 20, "SUCCESS": 25, "WARN": 30, "ERR": 40}
+_LOG_MIN = _LOG_LEVELS.get(LOG_LEVEL, 20)
+
+def _log_on(cat: str) -> bool:
+    """Cheap pre-check so hot paths can skip building a message that would be dropped."""
+    return _LOG_LEVELS.get(cat, 40) >= _LOG_MIN
+
 def log(msg, cat="INFO"):
+    if not _log_on(cat): return
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     c = CLR.get(cat, ""); e = CLR["RESET"] if c else ""
     print(f"{c}[{ts}] {cat}: {msg}{e}", flush=True)
@@ -305,6 +382,7 @@ METRICS = {
     "dm_bytes_out": 0,
     "http_calls": 0,
     "http_fail": 0,
+    "http_coalesced": 0,
 }
 
 def _bump(key: str, delta: int = 1):
@@ -327,16 +405,19 @@ def _metrics_summary() -> str:
 
 from threading import Semaphore, Lock
 _CONC = Semaphore(FORWARD_CONCURRENCY)
-_rl_lock = Lock()
-class _Bucket: __slots__=("ts","tokens")
+class _Bucket:
+    __slots__ = ("ts", "tokens", "lock")
+    def __init__(self, now: float):
+        self.ts = now; self.tokens = float(FORWARD_RATE_BURST); self.lock = Lock()
 _buckets: Dict[str,_Bucket] = {}
 
 def _rate_ok(ip: str) -> bool:
     now = time.time()
-    with _rl_lock:
-        b = _buckets.get(ip)
-        if b is None:
-            b = _Bucket(); b.ts = now; b.tokens = float(FORWARD_RATE_BURST); _buckets[ip]=b
+    b = _buckets.get(ip)
+    if b is None:
+        # setdefault is atomic under the GIL, so racing first requests share one bucket
+        b = _buckets.setdefault(ip, _Bucket(now))
+    with b.lock:   # per-IP; callers from different IPs never contend
         dt = max(0.0, now - b.ts); b.ts = now
         b.tokens = min(float(FORWARD_RATE_BURST), b.tokens + dt*FORWARD_RATE_RPS)
         if b.tokens < 1.0:
@@ -344,19 +425,66 @@ def _rate_ok(ip: str) -> bool:
         b.tokens -= 1.0
         return True
 
+_RL_SWEEP_S = 30.0
+_RL_IDLE_S  = FORWARD_RATE_BURST / FORWARD_RATE_RPS   # idle this long == refilled to burst
+
+def _sweep_buckets():
+    """Drop buckets that have refilled completely; a fresh one would behave the same."""
+    while True:
+        time.sleep(_RL_SWEEP_S)
+        cutoff = time.time() - _RL_IDLE_S
+        for ip, b in list(_buckets.items()):
+            if b.ts < cutoff and _buckets.get(ip) is b:
+                _buckets.pop(ip, None)
+
+threading.Thread(target=_sweep_buckets, daemon=True, name="rl-sweep").start()
+
 # ─────────────────────────────────────────────────────────────────────────────
-# 4) NKN sidecar supervisor — NDJSON bridge
+# 4) NKN sidecar supervisor — length-prefixed binary bridge
 # ─────────────────────────────────────────────────────────────────────────────
-import threading, queue
+import threading, queue, struct, weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+_U32 = struct.Struct("<I")
+_FRAME_MAX = 64 * 1024 * 1024   # anything larger means the stream is out of sync
+
+def _frame(head: Dict[str, Any], body: bytes = b"") -> bytes:
+    h = _dumps(head)
+    return b"".join((_U32.pack(len(h)), h, _U32.pack(len(body)), body))
+
+def _read_exact(f, n: int) -> Optional[bytes]:
+    buf = f.read(n)
+    while buf is not None and len(buf) < n:
+        more = f.read(n - len(buf))
+        if not more: return None
+        buf += more
+    return buf
+
+def _read_part(f) -> Optional[bytes]:
+    pre = _read_exact(f, 4)
+    if pre is None: return None
+    n = _U32.unpack(pre)[0]
+    if n > _FRAME_MAX:
+        log(f"sidecar frame part of {n} bytes; stream out of sync", "ERR"); return None
+    return _read_exact(f, n)
+
+def _read_frame(f) -> Optional[Tuple[bytes, bytes]]:
+    """One raw (head, body) frame from the sidecar, or None on EOF / desync."""
+    head = _read_part(f)
+    if head is None: return None
+    body = _read_part(f)
+    if body is None: return None
+    return head, body
 
 class Sidecar:
     def __init__(self):
         self.proc = None
         self.reader = None
         self.addr = None
-        self.events = queue.Queue()   # (ev, data_dict)
+        self.events = queue.Queue()   # (ev, data_dict); "message" events carry payload bytes
         self.lock = threading.Lock()
-        self.send_q: "queue.Queue[Tuple[str,str,str]]" = queue.Queue(maxsize=NKN_SEND_QUEUE_MAX)
+        self.send_q: "queue.Queue[Tuple[str,bytes,str]]" = queue.Queue(maxsize=NKN_SEND_QUEUE_MAX)
         self.stop_evt = threading.Event()
         self.sender = None
     def start(self):
@@ -387,18 +515,22 @@ class Sidecar:
         self.proc = subprocess.Popen(
             ["node", str(SIDECAR_JS)],
             cwd=str(SIDE_DIR),
-            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-            text=True, bufsize=1, env=env
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=None,  # stderr passes through
+            env=env
         )
         def _read():
-            for line in self.proc.stdout:
-                line = line.strip()
-                if not line: continue
+            while True:
+                fr = _read_frame(self.proc.stdout)
+                if fr is None:
+                    log("NKN sidecar stream closed.", "WARN"); return
+                head, body = fr
                 try:
-                    obj = json.loads(line)
+                    obj = _loads(head)
                 except Exception:
                     continue
                 ev = obj.get("ev")
+                if ev == "message":
+                    obj["payload"] = body
                 if ev == "ready":
                     self.addr = obj.get("addr")
                     log(f"NKN sidecar ready: {self.addr}", "SUCCESS")
@@ -410,71 +542,219 @@ class Sidecar:
         delay = NKN_SEND_DELAY_MS / 1000.0
         while not self.stop_evt.is_set():
             try:
-                dest, payload_b64, msg_id = self.send_q.get(timeout=0.5)
+                dest, payload, msg_id = self.send_q.get(timeout=0.5)
             except queue.Empty:
                 continue
             try:
-                self._send_now(dest, payload_b64, msg_id)
+                self._send_now(dest, payload, msg_id)
             except Exception as e:
                 log(f"send queue error ({msg_id}): {e}", "WARN")
             if delay > 0:
                 time.sleep(delay)
 
-    def _send_now(self, dest: str, payload_b64: str, msg_id: str):
+    def _write(self, data: bytes):
         if not self.proc or not self.proc.stdin:
             raise RuntimeError("sidecar not running")
-        cmd = {"op":"send", "id": msg_id, "dest": dest, "payload_b64": payload_b64}
-        self.proc.stdin.write(json.dumps(cmd)+"\n"); self.proc.stdin.flush()
+        with self.lock:
+            self.proc.stdin.write(data); self.proc.stdin.flush()
+
+    def _send_now(self, dest: str, payload: bytes, msg_id: str):
+        self._write(_frame({"op":"send", "id": msg_id, "dest": dest}, payload))
 
-    def send(self, dest: str, payload_b64: str, msg_id: str):
+    def send(self, dest: str, payload: bytes, msg_id: str):
         try:
-            self.send_q.put((dest, payload_b64, msg_id), timeout=1.0)
+            self.send_q.put((dest, payload, msg_id), timeout=1.0)
         except queue.Full:
             raise RuntimeError("sidecar send queue is full; backpressure active")
 
     def close(self):
         self.stop_evt.set()
         try:
-            if self.proc and self.proc.stdin:
-                self.proc.stdin.write(json.dumps({"op":"close"})+"\n"); self.proc.stdin.flush()
+            self._write(_frame({"op":"close"}))
         except Exception: pass
 
 sidecar = Sidecar()
 sidecar.start()
 
-# DM pending futures (for /forward)
-import asyncio
-_pending: Dict[str, asyncio.Future] = {}
+# DM pending replies (for /forward): the dispatcher fills resp and sets ev; ASGI
+# waiters also get an asyncio.Event woken on their own loop. Only the waiter holds
+# a strong ref, so an entry disappears with it (timeout, cancelled request, ...).
+class _Slot:
+    __slots__ = ("ev", "resp", "loop", "aev", "__weakref__")
+    def __init__(self, loop=None):
+        self.ev = threading.Event(); self.resp = None
+        self.loop = loop
+        if loop is not None:
+            import asyncio
+            self.aev = asyncio.Event()
+        else:
+            self.aev = None
+_pending: "weakref.WeakValueDictionary[str, _Slot]" = weakref.WeakValueDictionary()
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 5) Geohash utilities (pure Python; no deps)
 # ─────────────────────────────────────────────────────────────────────────────
 _GH32 = "0123456789bcdefghjkmnpqrstuvwxyz"
-_GHMAP = {c:i for i,c in enumerate(_GH32)}
+
+# byte -> 5-bit value; 0xFF marks chars outside the alphabet. Upper case decodes
+# too, matching _looks_like_geohash_token which already accepts it.
+_GH_TBL = bytearray(b"\xff" * 256)
+for _i, _c in enumerate(_GH32): _GH_TBL[ord(_c)] = _GH_TBL[ord(_c.upper())] = _i
+_GH_TBL = bytes(_GH_TBL)
+
+_GH_MAX_LEN = 12   # 60 bits: fits one 64-bit word, ~2 cm cells
+
+def _compact64(x: int) -> int:
+    """Gather the even bits of a 64-bit word into the low 32 bits (Morton compact1by1)."""
+    x &= 0x5555555555555555
+    x = (x | (x >> 1))  & 0x3333333333333333
+    x = (x | (x >> 2))  & 0x0F0F0F0F0F0F0F0F
+    x = (x | (x >> 4))  & 0x00FF00FF00FF00FF
+    x = (x | (x >> 8))  & 0x0000FFFF0000FFFF
+    x = (x | (x >> 16)) & 0x00000000FFFFFFFF
+    return x
+
+def _geohash_decode(gh: str) -> Tuple[float, float]:
+    raw = gh.strip().encode()
+    fn = _SPECIALIZED.get(len(raw))
+    if fn is not None:
+        pt = fn(raw)
+        if pt is not None: return pt
+    bits = 0
+    if len(raw) > _GH_MAX_LEN: raise ValueError(f"geohash longer than {_GH_MAX_LEN} chars")
+    for b in raw:
+        val = _GH_TBL[b]
+        if val == 0xFF: raise ValueError(f"invalid geohash char: {chr(b)}")
+        bits = (bits << 5) | val
+    # bits alternate lon/lat starting with lon at the MSB; the LSB belongs to
+    # lon when the total bit count is odd
+    nbits = 5 * len(raw)
+    nlat = nbits >> 1; nlon = nbits - nlat
+    if nbits & 1:
+        lon_i = _compact64(bits); lat_i = _compact64(bits >> 1)
+    else:
+        lon_i = _compact64(bits >> 1); lat_i = _compact64(bits)
+    # cell centre: (2i+1) / 2^(n+1) of the range
+    lat = ((lat_i << 1) | 1) * (180.0 / (1 << (nlat + 1))) - 90.0
+    lng = ((lon_i << 1) | 1) * (360.0 / (1 << (nlon + 1))) - 180.0
+    return (lat, lng)
+
+def _make_decoder(n: int):
+    """
+    Build a decoder for exactly n chars: table lookups, shifts, the Morton
+    compaction and the cell-size constants are unrolled and baked in. Takes the
+    encoded bytes; returns None on an invalid char so the generic path can raise.
+    """
+    nbits = 5 * n
+    nlat = nbits >> 1; nlon = nbits - nlat
+    lon_sh, lat_sh = (0, 1) if nbits & 1 else (1, 0)
+    vs = [f"v{i}" for i in range(n)]
+    src = [f"def _gh_decode_{n}(raw, t=_GH_TBL):",
+           f"    {', '.join(vs)}, = " + ", ".join(f"t[raw[{i}]]" for i in range(n)),
+           f"    if ({' | '.join(vs)}) > 31: return None",
+           "    bits = " + " | ".join(f"({v} << {5*(n-1-i)})" if i < n-1 else v for i, v in enumerate(vs))]
+    for name, sh in (("lon_i", lon_sh), ("lat_i", lat_sh)):
+        src.append(f"    x = (bits >> {sh}) & 0x5555555555555555" if sh else "    x = bits & 0x5555555555555555")
+        for s, m in ((1, 0x3333333333333333), (2, 0x0F0F0F0F0F0F0F0F), (4, 0x00FF00FF00FF00FF),
+                     (8, 0x0000FFFF0000FFFF), (16, 0x00000000FFFFFFFF)):
+            src.append(f"    x = (x | (x >> {s})) & {m:#018x}")
+        src.append(f"    {name} = x")
+    src.append(f"    return (((lat_i << 1) | 1) * {180.0 / (1 << (nlat + 1))!r} - 90.0, "
+               f"((lon_i << 1) | 1) * {360.0 / (1 << (nlon + 1))!r} - 180.0)")
+    ns = {"_GH_TBL": _GH_TBL}
+    exec("\n".join(src), ns)
+    return ns[f"_gh_decode_{n}"]
+
+# common fixed precisions (9 is the usual client default)
+_SPECIALIZED = {n: _make_decoder(n) for n in (9, 10, 12)}
+
+_GH_BATCH_MIN = 8   # below this the scalar decoder wins over numpy setup cost
+
+if np is not None:
+    _GH_LUT = np.frombuffer(_GH_TBL, dtype=np.uint8)
+    _U5 = np.uint64(5)
+    _COMPACT_STEPS = [(np.uint64(s), np.uint64(m)) for s, m in (
+        (1,  0x3333333333333333), (2, 0x0F0F0F0F0F0F0F0F), (4, 0x00FF00FF00FF00FF),
+        (8,  0x0000FFFF0000FFFF), (16, 0x00000000FFFFFFFF))]
+
+    def _compact64_np(x):
+        x = x & np.uint64(0x5555555555555555)
+        for s, m in _COMPACT_STEPS:
+            x = (x | (x >> s)) & m
+        return x
+
+def geohash_decode_many(ghs: List[str]):
+    """
+    Vectorized geohash_decode. Returns (lat_arr, lng_arr) as float64 ndarrays.
+    Equal-length hashes take the numpy path; anything else (mixed lengths,
+    non-ASCII, over-long) goes through the scalar decoder.
+    """
+    toks = [g.strip() for g in ghs]
+    n = len(toks)
+    width = len(toks[0]) if n else 0
+    raw = "".join(toks).encode()
+    if not n or width > _GH_MAX_LEN or len(raw) != n * width or len(set(map(len, toks))) != 1:
+        pts = [_geohash_decode(t) for t in toks]
+        return (np.array([p[0] for p in pts], dtype=np.float64),
+                np.array([p[1] for p in pts], dtype=np.float64))
+    vals = _GH_LUT[np.frombuffer(raw, dtype=np.uint8).reshape(n, width)]
+    bad = (vals == 0xFF).any(axis=1)
+    if bad.any():
+        _geohash_decode(toks[int(bad.argmax())])  # raises with the offending char
+    vals = vals.astype(np.uint64)
+    bits = np.zeros(n, dtype=np.uint64)
+    for i in range(width):
+        bits = (bits << _U5) | vals[:, i]
+    nbits = 5 * width
+    nlat = nbits >> 1; nlon = nbits - nlat
+    if nbits & 1:
+        lon_i = _compact64_np(bits); lat_i = _compact64_np(bits >> np.uint64(1))
+    else:
+        lon_i = _compact64_np(bits >> np.uint64(1)); lat_i = _compact64_np(bits)
+    lat = (lat_i.astype(np.float64) * 2.0 + 1.0) * (180.0 / (1 << (nlat + 1))) - 90.0
+    lng = (lon_i.astype(np.float64) * 2.0 + 1.0) * (360.0 / (1 << (nlon + 1))) - 180.0
+    return lat, lng
+
+def _decode_uncached(ghs: List[str]) -> List[Tuple[float, float]]:
+    if np is not None and len(ghs) >= _GH_BATCH_MIN:
+        lat, lng = geohash_decode_many(ghs)
+        return list(zip(lat.tolist(), lng.tolist()))
+    return [_geohash_decode(g) for g in ghs]
+
+# Decoded points by geohash. A plain dict rather than functools.lru_cache so the
+# batch path can look up hits first and decode only the misses; it is emptied
+# wholesale when full (single dict ops are atomic under the GIL, no lock needed).
+_gh_cache: Dict[str, Tuple[float, float]] = {}
+
+def _cache_put(gh: str, pt: Tuple[float, float]):
+    if len(_gh_cache) >= FORWARD_GH_CACHE: _gh_cache.clear()
+    _gh_cache[gh] = pt
 
 def geohash_decode(gh: str) -> Tuple[float, float]:
-    even = True
-    lat_min, lat_max = -90.0, 90.0
-    lon_min, lon_max = -180.0, 180.0
-    for c in gh.strip():
-        val = _GHMAP.get(c)
-        if val is None: raise ValueError(f"invalid geohash char: {c}")
-        for mask in (16,8,4,2,1):
-            if even:
-                mid = (lon_min + lon_max) / 2
-                if val & mask: lon_min = mid
-                else:          lon_max = mid
-            else:
-                mid = (lat_min + lat_max) / 2
-                if val & mask: lat_min = mid
-                else:          lat_max = mid
-            even = not even
-    return ( (lat_min + lat_max) / 2, (lon_min + lon_max) / 2 )
+    if not FORWARD_GH_CACHE: return _geohash_decode(gh)
+    pt = _gh_cache.get(gh)
+    if pt is None:
+        pt = _geohash_decode(gh); _cache_put(gh, pt)
+    return pt
+
+def _decode_geohashes(ghs: List[str]) -> List[Tuple[float, float]]:
+    if not FORWARD_GH_CACHE: return _decode_uncached(ghs)
+    get = _gh_cache.get
+    pts = [get(g) for g in ghs]
+    miss = [i for i, pt in enumerate(pts) if pt is None]
+    if miss:
+        for i, pt in zip(miss, _decode_uncached([ghs[i] for i in miss])):
+            pts[i] = pt; _cache_put(ghs[i], pt)
+    return pts
 
 def _looks_like_geohash_token(tok: str) -> bool:
+    # rstrip drops every trailing alphabet char in one C-level pass; anything
+    # left over (",", " ", "a", ...) means the token is not a geohash
     tok = tok.strip().lower()
-    if not tok or ("," in tok) or (" " in tok): return False
-    return all(ch in _GHMAP for ch in tok)
+    return bool(tok) and not tok.rstrip(_GH32)
+
+def _check_points(n: int):
+    if n > FORWARD_MAX_POINTS: raise ValueError(f"too many points: {n} > {FORWARD_MAX_POINTS}")
 
 def _parse_locations_or_geohashes(payload: Dict[str, Any]) -> Tuple[str, List[Tuple[float,float]], Optional[List[str]]]:
     """
@@ -489,19 +769,22 @@ def _parse_locations_or_geohashes(payload: Dict[str, Any]) -> Tuple[str, List[Tu
         if isinstance(payload["geohashes"], str):
             ghs = [t for t in payload["geohashes"].split("|") if t.strip()]
         else:
+            _check_points(len(payload["geohashes"]))
             ghs = [str(t).strip() for t in payload["geohashes"] if str(t).strip()]
-        latlng = [geohash_decode(g) for g in ghs]
+        _check_points(len(ghs))
+        latlng = _decode_geohashes(ghs)
         return "geohash", latlng, ghs
 
     # 2) locations as list/str — could be lat/lng or geohash strings
     locs = payload.get("locations")
     if isinstance(locs, list) and locs:
+        _check_points(len(locs))
         if isinstance(locs[0], dict) and ("lat" in locs[0]) and ("lng" in locs[0]):
             return "latlng", [(float(p["lat"]), float(p["lng"])) for p in locs], None
         if isinstance(locs[0], str):
             toks = [t.strip() for t in locs if t.strip()]
             if toks and all(_looks_like_geohash_token(t) for t in toks):
-                latlng = [geohash_decode(g) for g in toks]
+                latlng = _decode_geohashes(toks)
                 return "geohash", latlng, toks
             pairs: List[Tuple[float,float]] = []
             for t in toks:
@@ -512,8 +795,9 @@ def _parse_locations_or_geohashes(payload: Dict[str, Any]) -> Tuple[str, List[Tu
 
     if isinstance(locs, str) and locs.strip():
         toks = [t for t in locs.split("|") if t.strip()]
+        _check_points(len(toks))
         if toks and all(_looks_like_geohash_token(t) for t in toks):
-            latlng = [geohash_decode(g) for g in toks]
+            latlng = _decode_geohashes(toks)
             return "geohash", latlng, toks
         pairs: List[Tuple[float,float]] = []
         for t in toks:
@@ -528,22 +812,179 @@ def _parse_locations_or_geohashes(payload: Dict[str, Any]) -> Tuple[str, List[Tu
 # ─────────────────────────────────────────────────────────────────────────────
 def _now_ms() -> int: return int(time.time()*1000)
 
+# one keep-alive pool to ELEV_BASE, sized to the upstream concurrency cap
+_HTTP = urllib3.PoolManager(
+    num_pools=1, maxsize=FORWARD_CONCURRENCY, block=True, retries=False,
+    timeout=urllib3.Timeout(total=ELEV_TIMEOUT_MS/1000.0),
+)
+
+@functools.lru_cache(maxsize=64)
+def _elev_url_prefix(ds: str) -> str:
+    return f"{ELEV_BASE}/v1/{ds}?locations="
+
+def _format_locations(latlng: List[Tuple[float,float]]) -> str:
+    # one C-level %-format over the flattened pairs instead of an f-string per point;
+    # the output only holds [0-9.,|-] (or nan/inf), so it needs no URL quoting
+    if not latlng: return ""
+    return ("|%.6f,%.6f" * len(latlng))[1:] % tuple(itertools.chain.from_iterable(latlng))
+
 def _http_elev_query_from_latlng(latlng: List[Tuple[float,float]], dataset: Optional[str]) -> Dict[str, Any]:
-    pairs = [f"{lat:.6f},{lng:.6f}" for (lat,lng) in latlng]
-    loc_q = "|".join(pairs)
+    """Upstream GET. The raw response bytes are kept under "body"; base64 only happens on the wire."""
     ds = (dataset or ELEV_DATASET).strip() or ELEV_DATASET
-    url = f"{ELEV_BASE}/v1/{ds}?locations={requests.utils.quote(loc_q, safe='|,')}"
+    url = _elev_url_prefix(ds) + _format_locations(latlng)
     t0 = _now_ms()
     try:
-        resp = requests.get(url, timeout=ELEV_TIMEOUT_MS/1000.0)
+        resp = _HTTP.request("GET", url)
         dur = _now_ms() - t0
-        body = resp.content or b""
         headers = {str(k): str(v) for k, v in resp.headers.items()}
-        return {"status": resp.status_code, "headers": headers, "body_b64": base64.b64encode(body).decode(), "duration_ms": dur}
+        return {"status": resp.status, "headers": headers, "body": resp.data or b"", "duration_ms": dur}
     except Exception as e:
-        return {"status": 502, "headers": {"content-type":"application/json"},
-                "body_b64": base64.b64encode(json.dumps({"error": f"upstream failure: {e}"}).encode()).decode(),
-                "duration_ms": 0}
+        return _error_resp(502, f"upstream failure: {e}")
+
+def _error_resp(status: int, error: str) -> Dict[str, Any]:
+    return {"status": status, "headers": {"content-type":"application/json"},
+            "body": _dumps({"error": error}), "duration_ms": 0}
+
+def _key(lat: float, lng: float) -> int:
+    """Micro-degree (1e-6, same as the .6f wire format) point key packed into one int."""
+    return ((int(round(lat * 1e6)) & 0xFFFFFFFF) << 32) | (int(round(lng * 1e6)) & 0xFFFFFFFF)
+
+class _Job:
+    __slots__ = ("latlng", "ev", "resp", "cancelled")
+    def __init__(self, latlng: List[Tuple[float,float]]):
+        self.latlng = latlng; self.ev = threading.Event(); self.resp = None
+        self.cancelled = False   # waiter gave up; don't spend an upstream call on it
+
+class ElevBatcher:
+    """
+    Coalesces concurrent upstream lookups. Submissions for the same dataset that
+    arrive within window_ms are merged into one GET of up to max_batch points and
+    the results are split back by offset. A 4xx, a result count that doesn't line
+    up or a local error re-issues every job on its own, so one sender's bad point
+    never fails another's query; 5xx/transport failures are not point-specific and
+    go to everyone as-is. window_ms=0 queries straight through.
+    """
+    def __init__(self, max_batch: int = 100, window_ms: int = 10):
+        self.max_batch = max_batch
+        self.window = window_ms / 1000.0
+        self.queues: Dict[str, "deque[_Job]"] = {}
+        self.cond = threading.Condition()
+        self.pool = ThreadPoolExecutor(max_workers=FORWARD_CONCURRENCY, thread_name_prefix="elev-up")
+        self.thread = None
+        if self.window > 0:
+            self.thread = threading.Thread(target=self._run, daemon=True, name="elev-batch"); self.thread.start()
+
+    def query(self, latlng: List[Tuple[float,float]], dataset: Optional[str]) -> Dict[str, Any]:
+        ds = str(dataset or ELEV_DATASET).strip() or ELEV_DATASET
+        if self.thread is None or len(latlng) >= self.max_batch:
+            return self._call(latlng, ds)
+        job = _Job(latlng)
+        with self.cond:
+            self.queues.setdefault(ds, deque()).append(job)
+            self.cond.notify()
+        if not job.ev.wait(_BATCH_WAIT_S):
+            job.cancelled = True
+            return _error_resp(504, "upstream batch timeout")
+        return job.resp
+
+    def _call(self, latlng: List[Tuple[float,float]], ds: str) -> Dict[str, Any]:
+        with _CONC:
+            resp = _http_elev_query_from_latlng(latlng, ds)
+        _bump("http_calls")
+        return resp
+
+    def _take(self, q: "deque[_Job]") -> List[_Job]:
+        jobs = [q.popleft()]; n = len(jobs[0].latlng)
+        while q and n + len(q[0].latlng) <= self.max_batch:
+            n += len(q[0].latlng); jobs.append(q.popleft())
+        return jobs
+
+    def _submit(self, ds: str, jobs: List[_Job]):
+        try:
+            self.pool.submit(self._flush, ds, jobs)
+        except RuntimeError:   # pool already shut down (interpreter exiting): answer inline
+            self._flush(ds, jobs)
+
+    def _run(self):
+        while True:
+            try:
+                with self.cond:
+                    while not self.queues: self.cond.wait()
+                time.sleep(self.window)   # let the rest of the burst join
+                with self.cond:
+                    batches = []
+                    for ds, q in self.queues.items():
+                        while q: batches.append((ds, self._take(q)))
+                    self.queues.clear()
+                for ds, jobs in batches:
+                    self._submit(ds, jobs)
+            except Exception as e:   # keep coalescing; stranded waiters time out in query()
+                log(f"elev batcher error: {e}", "WARN")
+
+    def _flush(self, ds: str, jobs: List[_Job]):
+        jobs = [j for j in jobs if not j.cancelled]
+        todo = jobs   # jobs this call answers (and must wake)
+        try:
+            if not jobs: return
+            if len(jobs) == 1:
+                jobs[0].resp = self._call(jobs[0].latlng, ds); return
+            merged = [pt for j in jobs for pt in j.latlng]
+            try:
+                resp = self._call(merged, ds)
+            except Exception:   # local failure on the merged input: find out per job
+                resp = None
+            if resp is not None:
+                status = resp.get("status")
+                if not isinstance(status, int) or status >= 500:
+                    for j in jobs: j.resp = dict(resp)   # outage: no k extra calls against a failing upstream
+                    return
+                if self._split(resp, jobs, len(merged)):
+                    _bump("http_coalesced", len(jobs) - 1); return
+            todo = []
+            for j in jobs: self._submit(ds, [j])
+        except Exception as e:
+            for j in todo:
+                if j.resp is None: j.resp = _error_resp(502, f"upstream failure: {e}")
+        finally:
+            for j in todo: j.ev.set()
+
+    @staticmethod
+    def _split(resp: Dict[str, Any], jobs: List[_Job], total: int) -> bool:
+        """Give each job its slice of a merged 200 reply; False when it can't be split by offset (4xx included)."""
+        if resp.get("status") != 200: return False
+        try: upstream = _loads(resp.get("body") or b"{}")
+        except Exception: return False
+        results = upstream.get("results") if isinstance(upstream, dict) else None
+        if not isinstance(results, list) or len(results) != total: return False
+        headers = {k: v for k, v in (resp.get("headers") or {}).items() if k.lower() != "content-length"}
+        off = 0
+        for j in jobs:
+            n = len(j.latlng)
+            body = dict(upstream); body["results"] = results[off:off+n]; off += n
+            j.resp = {"status": resp["status"], "headers": headers, "body": _dumps(body), "duration_ms": resp.get("duration_ms", 0)}
+        return True
+
+_BATCH_WAIT_S = ELEV_TIMEOUT_MS/1000.0 + 5
+_batcher = ElevBatcher(FORWARD_BATCH_MAX, FORWARD_BATCH_WINDOW_MS)
+
+def _repack_geohash(resp: Dict[str, Any], gh_list: List[str], latlng: List[Tuple[float,float]], where: str):
+    """Rewrite an upstream body in place as {"results":[{"geohash","elevation"}, ...]}."""
+    try:
+        upstream = _loads(resp.get("body") or b"{}")
+        results = upstream.get("results") or []
+        if len(results) == len(gh_list):
+            out = [{"geohash": gh, "elevation": r.get("elevation")} for gh, r in zip(gh_list, results)]
+        else:
+            m = {}
+            for r in results:
+                loc = r.get("location") or {}
+                m[_key(float(loc.get("lat",0.0)), float(loc.get("lng",0.0)))] = r.get("elevation", None)
+            out = [{"geohash": gh, "elevation": m.get(_key(lat, lng))} for gh, (lat,lng) in zip(gh_list, latlng)]
+        resp["body"] = _dumps({"results": out})
+        resp["headers"] = dict(resp.get("headers") or {})
+        resp["headers"]["content-type"] = "application/json"
+    except Exception as e:
+        log(f"repack failed ({where}): {e}", "WARN")
 
 def _compute_chunk_limit(msg: Dict[str, Any]) -> int:
     """Determine chunk size for DM responses (raw bytes per chunk)."""
@@ -563,98 +1004,91 @@ def _compute_chunk_limit(msg: Dict[str, Any]) -> int:
         return min(limit, base)
     return limit
 
-def _decode_body(resp: Dict[str, Any]) -> bytes:
-    b64 = resp.get("body_b64")
-    if not b64:
-        return b""
-    try:
-        data = b64 if isinstance(b64, (bytes, bytearray)) else str(b64).encode()
-        return base64.b64decode(data)
-    except Exception:
-        return b""
+def _encode_reply(head: Dict[str, Any], body: bytes) -> bytes:
+    """
+    One JSON document: the serialized header fields plus "body_b64". The body is
+    base64'd exactly once and spliced in, never passed through the serializer.
+    """
+    j = _dumps(head)
+    return b"".join((j[:-1], b"," if len(j) > 2 else b"", b'"body_b64":"', base64.b64encode(body), b'"}'))
 
-def _emit_chunked_response(src: str, resp: Dict[str, Any], rid: str, body: bytes, chunk_limit: int):
-    if not body:
-        wire = base64.b64encode(json.dumps(resp, separators=(",",":")).encode()).decode()
-        sidecar.send(src, wire, msg_id=rid)
-        return
+def _send_dm(src: str, data: bytes, msg_id: str):
+    sidecar.send(src, data, msg_id=msg_id)
+
+def _emit_chunked_response(src: str, head: Dict[str, Any], rid: str, body: bytes, chunk_limit: int):
     chunk_size = max(1, chunk_limit)
     total = len(body)
     chunk_count = max(1, math.ceil(total / chunk_size))
     digest = hashlib.sha256(body).hexdigest()
     for idx in range(chunk_count):
         start = idx * chunk_size
-        chunk = body[start:start+chunk_size]
-        chunk_msg = {
+        chunk_head = {
             "type": "http.chunk",
             "id": rid,
             "chunk_index": idx,
             "chunk_count": chunk_count,
             "bytes_total": total,
-            "body_b64": base64.b64encode(chunk).decode()
         }
-        wire = base64.b64encode(json.dumps(chunk_msg, separators=(",",":")).encode()).decode()
-        sidecar.send(src, wire, msg_id=f"{rid}-chunk-{idx}")
-    resp = dict(resp)
-    resp["chunked"] = True
-    resp["chunk_count"] = chunk_count
-    resp["bytes_total"] = total
-    resp["body_digest"] = digest
-    resp["body_b64"] = ""
-    wire_resp = base64.b64encode(json.dumps(resp, separators=(",",":")).encode()).decode()
-    sidecar.send(src, wire_resp, msg_id=rid)
+        _send_dm(src, _encode_reply(chunk_head, body[start:start+chunk_size]), f"{rid}-chunk-{idx}")
+    head = dict(head)
+    head["chunked"] = True
+    head["chunk_count"] = chunk_count
+    head["bytes_total"] = total
+    head["body_digest"] = digest
+    _send_dm(src, _encode_reply(head, b""), rid)
 
 def _send_http_response(src: str, mid: str, resp: Dict[str, Any], chunk_limit: int):
     rid = mid or resp.get("id") or uuid.uuid4().hex
     meta = {"bytes_total": 0, "chunk_count": 0, "chunk_limit": chunk_limit or 0}
     payload = dict(resp)
     payload["id"] = rid
-    body_len = len(_decode_body(payload))
-    meta["bytes_total"] = body_len
-    if chunk_limit > 0:
-        body = _decode_body(payload)
-        if len(body) > chunk_limit:
-            chunk_count = math.ceil(len(body) / max(1, chunk_limit))
-            meta["chunk_count"] = chunk_count
-            _emit_chunked_response(src, payload, rid, body, chunk_limit)
-            return meta
-    wire = base64.b64encode(json.dumps(payload, separators=(",",":")).encode()).decode()
-    sidecar.send(src, wire, msg_id=rid)
+    body = payload.pop("body", None) or b""
+    meta["bytes_total"] = len(body)
+    if chunk_limit > 0 and len(body) > chunk_limit:
+        meta["chunk_count"] = math.ceil(len(body) / max(1, chunk_limit))
+        _emit_chunked_response(src, payload, rid, body, chunk_limit)
+        return meta
+    _send_dm(src, _encode_reply(payload, body), rid)
     return meta
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 7) Dispatcher consuming sidecar events
 # ─────────────────────────────────────────────────────────────────────────────
-def _handle_incoming_dm(src: str, payload_b64: str):
+def _handle_incoming_dm(src: str, raw: bytes):
     _bump("dm_received")
     try:
-        raw = base64.b64decode(payload_b64) if payload_b64 else b""
-        msg = json.loads(raw.decode("utf-8", "ignore") or "{}")
+        msg = _loads(raw or b"{}")
     except Exception:
         _bump("dm_errors")
         return
+    if not isinstance(msg, dict):
+        _bump("dm_errors")
+        return
     _bump("dm_bytes_in", len(raw))
     t = str(msg.get("type","")).lower()
     mid = str(msg.get("id") or "")
+    rid = mid or uuid.uuid4().hex   # reply id, generated once when the sender gave none
     chunk_limit = _compute_chunk_limit(msg)
 
     if t == "ping":
         reply = {
-            "id": mid or uuid.uuid4().hex,
+            "id": rid,
             "type": "pong",
             "ts": int(time.time()*1000),
             "addr": sidecar.addr
         }
-        wire = base64.b64encode(json.dumps(reply, separators=(",",":")).encode()).decode()
-        sidecar.send(src, wire, msg_id=mid or uuid.uuid4().hex)
-        log(f"[DM] pong → {src} id={mid or 'auto'}", "INFO")
+        _send_dm(src, _dumps(reply), rid)
+        if _log_on("INFO"): log(f"[DM] pong → {src} id={mid or 'auto'}", "INFO")
         return
 
-    # Fulfill /forward futures
+    # Wake /forward waiters
     if t == "http.response" and mid:
-        fut = _pending.pop(mid, None)
-        if fut and not fut.done():
-            fut.set_result(msg)
+        slot = _pending.pop(mid, None)
+        if slot:
+            slot.resp = msg; slot.ev.set()
+            if slot.loop is not None:
+                try: slot.loop.call_soon_threadsafe(slot.aev.set)
+                except RuntimeError: pass   # loop already closed (server shutting down)
         return
 
     if t in ("elev.query", "http.request"):
@@ -664,46 +1098,18 @@ def _handle_incoming_dm(src: str, payload_b64: str):
             try:
                 mode, latlng, gh_list = _parse_locations_or_geohashes(msg)
             except Exception as e:
-                reply = {"id": mid or uuid.uuid4().hex, "type":"http.response",
-                         "status": 400, "headers": {"content-type":"application/json"},
-                         "body_b64": base64.b64encode(json.dumps({"error": f"bad request: {e}"}).encode()).decode(),
-                         "duration_ms": 0}
+                reply = {"id": rid, "type":"http.response", **_error_resp(400, f"bad request: {e}")}
                 _bump("dm_errors")
-                _send_http_response(src, mid, reply, chunk_limit)
-                log(f"[DM] elev.query ❌ bad request from {src} id={mid or 'n/a'} err={e} chunkLimit={_fmt_kb(chunk_limit)}", "WARN")
+                _send_http_response(src, rid, reply, chunk_limit)
+                log(f"[DM] elev.query ❌ bad request from {src} id={rid} err={e} chunkLimit={_fmt_kb(chunk_limit)}", "WARN")
                 return
 
-            with _CONC:
-                resp = _http_elev_query_from_latlng(latlng, dataset)
-            _bump("http_calls")
+            resp = _batcher.query(latlng, dataset)
             if mode == "geohash" and gh_list is not None:
-                try:
-                    body_bytes = base64.b64decode(resp.get("body_b64") or b"")
-                    upstream = json.loads(body_bytes.decode("utf-8","ignore") or "{}")
-                    results = upstream.get("results") or []
-                    out = []
-                    if len(results) == len(gh_list):
-                        for gh, r in zip(gh_list, results):
-                            elev = r.get("elevation", None)
-                            out.append({"geohash": gh, "elevation": elev})
-                    else:
-                        m = {}
-                        for r in results:
-                            loc = r.get("location") or {}
-                            k = f'{float(loc.get("lat",0.0)):.6f},{float(loc.get("lng",0.0)):.6f}'
-                            m[k] = r.get("elevation", None)
-                        for gh, (lat,lng) in zip(gh_list, latlng):
-                            k = f"{lat:.6f},{lng:.6f}"
-                            out.append({"geohash": gh, "elevation": m.get(k)})
-                    body = json.dumps({"results": out}, separators=(",",":")).encode()
-                    resp["body_b64"] = base64.b64encode(body).decode()
-                    resp["headers"] = dict(resp.get("headers") or {})
-                    resp["headers"]["content-type"] = "application/json"
-                except Exception as e:
-                    log(f"repack failed (geohash mode): {e}", "WARN")
-
-            reply = {"id": mid or uuid.uuid4().hex, "type":"http.response", **resp}
-            meta = _send_http_response(src, mid, reply, chunk_limit) or {}
+                _repack_geohash(resp, gh_list, latlng, "geohash mode")
+
+            reply = {"id": rid, "type":"http.response", **resp}
+            meta = _send_http_response(src, rid, reply, chunk_limit) or {}
             dur_ms = resp.get("duration_ms", 0)
             status = resp.get("status")
             ok = isinstance(status, int) and status < 500
@@ -714,62 +1120,40 @@ def _handle_incoming_dm(src: str, payload_b64: str):
                 _bump("dm_bytes_out", meta["bytes_total"])
             if meta.get("chunk_count"):
                 _bump("dm_chunked_out", meta["chunk_count"])
-            log(f"[DM] elev.query → {src} id={mid or reply['id']} mode={mode} geos={len(gh_list or latlng)} chunkLimit={_fmt_kb(meta.get('chunk_limit',0))} "
-                f"resp={status} bytes={_fmt_kb(meta.get('bytes_total',0))} chunks={meta.get('chunk_count',0)} upstream={dur_ms}ms in={len(raw)}B stats={_metrics_summary()}",
-                "SUCCESS" if ok else "WARN")
+            lvl = "SUCCESS" if ok else "WARN"
+            if _log_on(lvl):
+                log(f"[DM] elev.query → {src} id={rid} mode={mode} geos={len(gh_list or latlng)} chunkLimit={_fmt_kb(meta.get('chunk_limit',0))} "
+                    f"resp={status} bytes={_fmt_kb(meta.get('bytes_total',0))} chunks={meta.get('chunk_count',0)} upstream={dur_ms}ms in={len(raw)}B stats={_metrics_summary()}", lvl)
             return
 
         if t == "http.request":
             method = str(msg.get("method","GET")).upper()
             url    = str(msg.get("url","")).strip()
             if method != "GET" or not url.startswith("/v1/"):
-                body = base64.b64encode(json.dumps({"error":"only GET /v1/<dataset>?locations=... supported"}).encode()).decode()
-                reply = {"id": mid or uuid.uuid4().hex, "type":"http.response", "status":400, "headers":{"content-type":"application/json"}, "body_b64": body, "duration_ms":0}
-                _send_http_response(src, mid, reply, chunk_limit)
+                reply = {"id": rid, "type":"http.response", **_error_resp(400, "only GET /v1/<dataset>?locations=... supported")}
+                _send_http_response(src, rid, reply, chunk_limit)
                 _bump("dm_errors")
-                log(f"[DM] http.request ❌ invalid method/url from {src} id={mid or reply['id']} url={url}", "WARN")
+                log(f"[DM] http.request ❌ invalid method/url from {src} id={rid} url={url}", "WARN")
                 return
-            m = re.match(r"^/v1/([^?]+)\?locations=(.+)$", url)
-            if not m:
-                body = base64.b64encode(json.dumps({"error":"missing locations"}).encode()).decode()
-                reply = {"id": mid or uuid.uuid4().hex, "type":"http.response", "status":400, "headers":{"content-type":"application/json"}, "body_b64": body, "duration_ms":0}
-                _send_http_response(src, mid, reply, chunk_limit)
+            # "/v1/<ds>?locations=<q>" — plain partitioning, no regex
+            path, _, qs = url.partition("?")
+            dataset = path[4:]
+            if not dataset or not qs.startswith("locations=") or len(qs) == 10:
+                reply = {"id": rid, "type":"http.response", **_error_resp(400, "missing locations")}
+                _send_http_response(src, rid, reply, chunk_limit)
                 _bump("dm_errors")
-                log(f"[DM] http.request ❌ missing locations from {src} id={mid or reply['id']}", "WARN")
+                log(f"[DM] http.request ❌ missing locations from {src} id={rid}", "WARN")
                 return
-            dataset = m.group(1)
-            locs_q = requests.utils.unquote(m.group(2))
+            locs_q = unquote(qs[10:])
             try:
                 if "|" in locs_q and ("," not in locs_q):
                     gh_list = [t for t in locs_q.split("|") if t.strip()]
-                    latlng = [geohash_decode(g) for g in gh_list]
-                    with _CONC:
-                        resp = _http_elev_query_from_latlng(latlng, dataset)
-                    _bump("http_calls")
-                    try:
-                        body_bytes = base64.b64decode(resp.get("body_b64") or b"")
-                        upstream = json.loads(body_bytes.decode("utf-8","ignore") or "{}")
-                        results = upstream.get("results") or []
-                        out = []
-                        if len(results) == len(gh_list):
-                            for gh, r in zip(gh_list, results):
-                                out.append({"geohash": gh, "elevation": r.get("elevation")})
-                        else:
-                            mlat = {}
-                            for r in results:
-                                loc = r.get("location") or {}
-                                k = f'{float(loc.get("lat",0.0)):.6f},{float(loc.get("lng",0.0)):.6f}'
-                                mlat[k] = r.get("elevation", None)
-                            for gh, (lat,lng) in zip(gh_list, latlng):
-                                out.append({"geohash": gh, "elevation": mlat.get(f"{lat:.6f},{lng:.6f}")})
-                        body = json.dumps({"results": out}, separators=(",",":")).encode()
-                        resp["body_b64"] = base64.b64encode(body).decode()
-                        resp["headers"] = dict(resp.get("headers") or {})
-                        resp["headers"]["content-type"] = "application/json"
-                    except Exception as e:
-                        log(f"repack failed (http.request geohash): {e}", "WARN")
-                    reply = {"id": mid or uuid.uuid4().hex, "type":"http.response", **resp}
-                    meta = _send_http_response(src, mid, reply, chunk_limit) or {}
+                    _check_points(len(gh_list))
+                    latlng = _decode_geohashes(gh_list)
+                    resp = _batcher.query(latlng, dataset)
+                    _repack_geohash(resp, gh_list, latlng, "http.request geohash")
+                    reply = {"id": rid, "type":"http.response", **resp}
+                    meta = _send_http_response(src, rid, reply, chunk_limit) or {}
                     status = resp.get("status")
                     ok = isinstance(status, int) and status < 500
                     if not ok:
@@ -779,16 +1163,20 @@ def _handle_incoming_dm(src: str, payload_b64: str):
                         _bump("dm_bytes_out", meta["bytes_total"])
                     if meta.get("chunk_count"):
                         _bump("dm_chunked_out", meta["chunk_count"])
-                    log(f"[DM] http.request → {src} id={mid or reply['id']} gh={len(gh_list)} chunkLimit={_fmt_kb(meta.get('chunk_limit',0))} "
-                        f"resp={status} bytes={_fmt_kb(meta.get('bytes_total',0))} chunks={meta.get('chunk_count',0)} stats={_metrics_summary()}", "SUCCESS" if ok else "WARN")
+                    lvl = "SUCCESS" if ok else "WARN"
+                    if _log_on(lvl):
+                        log(f"[DM] http.request → {src} id={rid} gh={len(gh_list)} chunkLimit={_fmt_kb(meta.get('chunk_limit',0))} "
+                            f"resp={status} bytes={_fmt_kb(meta.get('bytes_total',0))} chunks={meta.get('chunk_count',0)} stats={_metrics_summary()}", lvl)
                     return
                 pairs = [t for t in locs_q.split("|") if t.strip()]
-                _ = [tuple(map(float, p.split(",",1))) for p in pairs]
-                with _CONC:
-                    resp = _http_elev_query_from_latlng(_, dataset)
-                _bump("http_calls")
-                reply = {"id": mid or uuid.uuid4().hex, "type":"http.response", **resp}
-                meta = _send_http_response(src, mid, reply, chunk_limit) or {}
+                _check_points(len(pairs))
+                _ = []
+                for p in pairs:
+                    a, b = p.split(",", 1)   # exactly one lat,lng per token; "3" or "1,2,3" is a 400
+                    _.append((float(a), float(b)))
+                resp = _batcher.query(_, dataset)
+                reply = {"id": rid, "type":"http.response", **resp}
+                meta = _send_http_response(src, rid, reply, chunk_limit) or {}
                 status = resp.get("status")
                 ok = isinstance(status, int) and status < 500
                 if not ok:
@@ -798,22 +1186,35 @@ def _handle_incoming_dm(src: str, payload_b64: str):
                     _bump("dm_bytes_out", meta["bytes_total"])
                 if meta.get("chunk_count"):
                     _bump("dm_chunked_out", meta.get("chunk_count"))
-                log(f"[DM] http.request → {src} id={mid or reply['id']} locs={len(_)} chunkLimit={_fmt_kb(meta.get('chunk_limit',0))} "
-                    f"resp={status} bytes={_fmt_kb(meta.get('bytes_total',0))} chunks={meta.get('chunk_count',0)} stats={_metrics_summary()}", "SUCCESS" if ok else "WARN")
+                lvl = "SUCCESS" if ok else "WARN"
+                if _log_on(lvl):
+                    log(f"[DM] http.request → {src} id={rid} locs={len(_)} chunkLimit={_fmt_kb(meta.get('chunk_limit',0))} "
+                        f"resp={status} bytes={_fmt_kb(meta.get('bytes_total',0))} chunks={meta.get('chunk_count',0)} stats={_metrics_summary()}", lvl)
                 return
             except Exception as e:
-                body = base64.b64encode(json.dumps({"error": f"bad locations: {e}"}).encode()).decode()
-                reply = {"id": mid or uuid.uuid4().hex, "type":"http.response", "status":400, "headers":{"content-type":"application/json"}, "body_b64": body, "duration_ms":0}
-                _send_http_response(src, mid, reply, chunk_limit)
+                reply = {"id": rid, "type":"http.response", **_error_resp(400, f"bad locations: {e}")}
+                _send_http_response(src, rid, reply, chunk_limit)
                 _bump("dm_errors")
-                log(f"[DM] http.request ❌ bad locations from {src} id={mid or reply['id']} err={e}", "WARN")
+                log(f"[DM] http.request ❌ bad locations from {src} id={rid} err={e}", "WARN")
                 return
 
+# DMs are handled on a small pool so concurrent queries overlap (and can be
+# coalesced by _batcher) instead of queueing behind one upstream round-trip
+_DM_WORKERS = ThreadPoolExecutor(max_workers=FORWARD_DM_WORKERS, thread_name_prefix="nkn-dm")
+
+def _handle_dm_safe(src: str, raw: bytes):
+    # runs on the pool, whose futures nobody reads: surface failures here
+    try:
+        _handle_incoming_dm(src, raw)
+    except Exception as e:
+        _bump("dm_errors")
+        log(f"[DM] handler failed for {src}: {e!r}", "WARN")
+
 def _event_loop():
     while True:
         ev, obj = sidecar.events.get()
         if ev == "message":
-            _handle_incoming_dm(obj.get("src"), obj.get("payload_b64") or "")
+            _DM_WORKERS.submit(_handle_dm_safe, obj.get("src"), obj.get("payload") or b"")
         elif ev == "error":
             log(f"Sidecar error: {obj.get('message')}", "ERR")
         elif ev == "ready":
@@ -824,21 +1225,37 @@ threading.Thread(target=_event_loop, daemon=True, name="nkn-dispatch").start()
 # ─────────────────────────────────────────────────────────────────────────────
 # 8) Flask HTTP API
 # ─────────────────────────────────────────────────────────────────────────────
-from werkzeug.serving import make_server, generate_adhoc_ssl_context
+from werkzeug.serving import make_server
 from werkzeug.serving import BaseWSGIServer
-from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.primitives.asymmetric import rsa
-import cryptography.x509 as x509
-from cryptography.x509 import NameOID, SubjectAlternativeName, DNSName, IPAddress
 import ipaddress as ipa
 import atexit, signal as _sig
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
+# loopback and unix-socket callers ("" remote addr) skip the bucket entirely
+_TRUSTED = frozenset({"127.0.0.1", "::1", "localhost", ""})
+
+def _client_ip() -> str:
+    ip = getattr(g, "client_ip", None)
+    if ip is None:
+        ip = request.headers.get("X-Forwarded-For","").partition(",")[0].strip() or request.remote_addr or ""
+        g.client_ip = ip
+    return ip
+
+def _is_trusted(ip: str) -> bool:
+    return ip in _TRUSTED or ip.startswith("127.") or ip.startswith("::ffff:127.")
+
+def _is_local_caller(peer: str, xff: str) -> bool:
+    # trust the socket peer only: X-Forwarded-For is client-controlled (and proxies
+    # append to it), so any request carrying one goes through the limiter
+    return not xff and _is_trusted(peer)
+
 @app.before_request
 def _rate_guard():
-    ip = request.headers.get("X-Forwarded-For","").split(",")[0].strip() or request.remote_addr or "0.0.0.0"
+    if _is_local_caller(request.remote_addr or "", request.headers.get("X-Forwarded-For", "")):
+        return None
+    ip = _client_ip()
     if not _rate_ok(ip):
         return jsonify({"error":"rate limit"}), 429, {"Retry-After":"1"}
 
@@ -849,18 +1266,20 @@ def healthz():
         "ts": int(time.time()*1000)
     })
 
-@app.post("/forward")
-def forward():
-    data = request.get_json(force=True, silent=True) or {}
+_FORWARD_WAIT_S = ELEV_TIMEOUT_MS/1000.0 + 5
+
+def _forward_start(data: Dict[str, Any], slot: Optional[_Slot] = None) -> Tuple[Optional[_Slot], str, Optional[Tuple[Dict[str, Any], int]]]:
+    """Validate a /forward body, register a reply slot and send the DM. Returns (slot, dm_id, error).
+    May block up to 1s on sidecar backpressure; async callers run it in an executor."""
     dest = (data.get("dest") or "").strip()
     dataset = data.get("dataset") or ELEV_DATASET
     if not dest:
-        return jsonify({"error":"dest required"}), 400
+        return None, "", ({"error":"dest required"}, 400)
 
     try:
         mode, latlng, gh_list = _parse_locations_or_geohashes(data)
     except Exception as e:
-        return jsonify({"error": f"bad payload: {e}"}), 400
+        return None, "", ({"error": f"bad payload: {e}"}, 400)
 
     dm_id = uuid.uuid4().hex
     payload = {"id": dm_id, "type":"elev.query", "dataset": dataset}
@@ -869,30 +1288,97 @@ def forward():
     else:
         payload["locations"] = [{"lat":lat,"lng":lng} for (lat,lng) in latlng]
 
-    wire = base64.b64encode(json.dumps(payload, separators=(",",":")).encode()).decode()
-
-    loop = asyncio.get_event_loop()
-    fut: asyncio.Future = loop.create_future()
-    _pending[dm_id] = fut
+    if slot is None: slot = _Slot()
+    _pending[dm_id] = slot
 
     try:
-        sidecar.send(dest, wire, msg_id=dm_id)
+        _send_dm(dest, _dumps(payload), dm_id)
     except Exception as e:
         _pending.pop(dm_id, None)
-        return jsonify({"error": f"send failed: {e}"}), 502
+        return None, dm_id, ({"error": f"send failed: {e}"}, 502)
+    return slot, dm_id, None
 
-    try:
-        dmresp = loop.run_until_complete(asyncio.wait_for(fut, timeout=ELEV_TIMEOUT_MS/1000.0 + 5))
-    except Exception:
+def _forward_result(dm_id: str, slot: _Slot) -> Tuple[Dict[str, Any], int]:
+    dmresp = slot.resp
+    if dmresp is None:
         _pending.pop(dm_id, None)
-        return jsonify({"error":"dm response timeout"}), 504
-
+        return {"error":"dm response timeout"}, 504
     body = base64.b64decode(dmresp.get("body_b64") or b"") if dmresp.get("body_b64") else b""
-    return jsonify({
+    return {
         "ok": True, "id": dm_id, "status": dmresp.get("status"), "headers": dmresp.get("headers"),
         "duration_ms": dmresp.get("duration_ms"), "body_b64": dmresp.get("body_b64"),
         "body_utf8": (body.decode("utf-8","ignore") if body else None)
-    })
+    }, 200
+
+@app.post("/forward")
+def forward():
+    slot, dm_id, err = _forward_start(request.get_json(force=True, silent=True) or {})
+    if err:
+        return jsonify(err[0]), err[1]
+    slot.ev.wait(timeout=_FORWARD_WAIT_S)
+    out, status = _forward_result(dm_id, slot)
+    return jsonify(out), status
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 8.1) ASGI front (FORWARD_SERVER=uvicorn): /forward waits as a coroutine, so
+#      in-flight DM round-trips don't each pin a worker thread. Everything else
+#      is handed to the Flask app through asgiref's WsgiToAsgi.
+# ─────────────────────────────────────────────────────────────────────────────
+async def _asgi_json(send, obj: Dict[str, Any], status: int, extra: Optional[List[Tuple[bytes, bytes]]] = None):
+    body = _dumps(obj)
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+               (b"access-control-allow-origin", b"*")] + (extra or [])
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+async def _asgi_forward(scope, receive, send):
+    import asyncio
+    hdrs = dict(scope.get("headers") or [])
+    client = scope.get("client") or ("", 0)
+    xff = hdrs.get(b"x-forwarded-for", b"").decode("latin-1")
+    ip = xff.partition(",")[0].strip() or client[0] or ""
+    if not _is_local_caller(client[0] or "", xff) and not _rate_ok(ip):
+        return await _asgi_json(send, {"error":"rate limit"}, 429, [(b"retry-after", b"1")])
+
+    chunks = []
+    while True:
+        msg = await receive()
+        chunks.append(msg.get("body", b""))
+        if not msg.get("more_body"): break
+    try:
+        data = _loads(b"".join(chunks) or b"{}")
+    except Exception:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+
+    loop = asyncio.get_running_loop()
+    # slot (and its asyncio.Event) is made here on the loop; the send may block on a full queue, so not here
+    slot, dm_id, err = await loop.run_in_executor(None, _forward_start, data, _Slot(loop))
+    if err:
+        return await _asgi_json(send, err[0], err[1])
+    try:
+        await asyncio.wait_for(slot.aev.wait(), timeout=_FORWARD_WAIT_S)
+    except asyncio.TimeoutError:
+        pass
+    out, status = _forward_result(dm_id, slot)
+    await _asgi_json(send, out, status)
+
+def _make_asgi_app():
+    from asgiref.wsgi import WsgiToAsgi
+    wsgi = WsgiToAsgi(app)
+    async def asgi_app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                msg = await receive()
+                if msg["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif msg["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"}); return
+        if scope["type"] == "http" and scope["path"] == "/forward" and scope["method"] == "POST":
+            return await _asgi_forward(scope, receive, send)
+        return await wsgi(scope, receive, send)
+    return asgi_app
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 9 TLS helpers + Serve
@@ -915,9 +1401,16 @@ def _get_all_sans():
     for h in FORWARD_SSL_SANS: dns.add(h)
     return sorted(dns), sorted(ip)
 
-def _generate_self_signed(cert_file: Path, key_file: Path):
-    from cryptography.hazmat.primitives.asymmetric import rsa
-    keyobj = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+def _self_signed_pem() -> Tuple[bytes, bytes]:
+    """(cert_pem, key_pem) for a 1-year self-signed cert covering our local SANs."""
+    # imported here: plain-HTTP and provided-cert setups never load cryptography
+    from cryptography.hazmat.primitives import serialization, hashes
+    from cryptography.hazmat.primitives.asymmetric import ec
+    import cryptography.x509 as x509
+    from cryptography.x509 import NameOID, SubjectAlternativeName, DNSName, IPAddress
+    # ECDSA P-256: keygen is near-instant (RSA-2048 can take seconds on small
+    # boards) and handshake signatures are cheaper. Not Ed25519: browsers reject it.
+    keyobj = ec.generate_private_key(ec.SECP256R1())
     dns_sans, ip_sans = _get_all_sans()
     san_list = [DNSName(d) for d in dns_sans]
     for i in ip_sans:
@@ -935,105 +1428,248 @@ def _generate_self_signed(cert_file: Path, key_file: Path):
           .not_valid_before(not_before).not_valid_after(not_after)
           .add_extension(san, critical=False).sign(keyobj, hashes.SHA256())
     )
+    key_pem = keyobj.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.TraditionalOpenSSL,
+        encryption_algorithm=serialization.NoEncryption())
+    return cert.public_bytes(serialization.Encoding.PEM), key_pem
+
+def _generate_self_signed(cert_file: Path, key_file: Path) -> Tuple[bytes, bytes]:
+    cert_pem, key_pem = _self_signed_pem()
     TLS_DIR.mkdir(parents=True, exist_ok=True)
-    with open(key_file, "wb") as f:
-        f.write(keyobj.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.TraditionalOpenSSL,
-            encryption_algorithm=serialization.NoEncryption()))
-    with open(cert_file, "wb") as f:
-        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_file, "wb") as f: f.write(key_pem)
+    with open(cert_file, "wb") as f: f.write(cert_pem)
     log(f"Generated self-signed TLS cert: {cert_file}", "SUCCESS")
+    return cert_pem, key_pem
+
+def _tune_ssl_context(ctx: ssl.SSLContext) -> ssl.SSLContext:
+    # AEAD + forward secrecy only; TLS 1.3 suites are all AEAD already
+    ctx.minimum_version = ssl.TLSVersion.TLSv1_3 if FORWARD_SSL_MIN == "1.3" else ssl.TLSVersion.TLSv1_2
+    ctx.set_ciphers("ECDHE+AESGCM:ECDHE+CHACHA20")
+    ctx.options |= ssl.OP_CIPHER_SERVER_PREFERENCE | ssl.OP_NO_COMPRESSION | getattr(ssl, "OP_NO_RENEGOTIATION", 0)
+    return ctx
+
+# contexts keyed by path + mtime: PEM is parsed once and re-read only when the files change
+@functools.lru_cache(maxsize=4)
+def _load_ssl_context(cert: str, key: str, cert_mtime: int, key_mtime: int) -> ssl.SSLContext:
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER); ctx.load_cert_chain(cert, key)
+    return _tune_ssl_context(ctx)
+
+def _ssl_context_for(cert_p: Path, key_p: Path) -> ssl.SSLContext:
+    return _load_ssl_context(str(cert_p), str(key_p), cert_p.stat().st_mtime_ns, key_p.stat().st_mtime_ns)
+
+def _ssl_context_from_pem(cert_pem: bytes, key_pem: bytes) -> ssl.SSLContext:
+    """
+    Context from PEM bytes already in memory. load_cert_chain only takes paths:
+    on Linux hand it anonymous memfds (the key never touches disk), elsewhere a
+    private temp dir.
+    """
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    if hasattr(os, "memfd_create") and os.path.isdir("/proc/self/fd"):
+        fds = []
+        try:
+            for pem in (cert_pem, key_pem):
+                fd = os.memfd_create("tls", os.MFD_CLOEXEC); fds.append(fd)
+                os.write(fd, pem)
+            ctx.load_cert_chain(*(f"/proc/self/fd/{fd}" for fd in fds))
+        finally:
+            for fd in fds: os.close(fd)
+    else:
+        import tempfile
+        with tempfile.TemporaryDirectory() as d:
+            cert_p = Path(d) / "cert.pem"; key_p = Path(d) / "key.pem"
+            cert_p.write_bytes(cert_pem); key_p.write_bytes(key_pem)
+            ctx.load_cert_chain(str(cert_p), str(key_p))
+    return _tune_ssl_context(ctx)
+
+@functools.lru_cache(maxsize=1)
+def _adhoc_ssl_context() -> ssl.SSLContext:
+    return _ssl_context_from_pem(*_self_signed_pem())
 
 def _build_ssl_context():
     mode = FORWARD_SSL_MODE
     if mode in ("0","off","false",""): return None, "http"
     if mode == "adhoc":
-        try: return generate_adhoc_ssl_context(), "https"
+        try: return _adhoc_ssl_context(), "https"
         except Exception as e: log(f"Adhoc SSL failed: {e}", "ERR"); return None, "http"
     cert_p = Path(FORWARD_SSL_CERT); key_p = Path(FORWARD_SSL_KEY)
     if mode in ("1","true","yes","on","generate"):
         if FORWARD_SSL_REFRESH or (not cert_p.exists() or not key_p.exists()):
-            _generate_self_signed(cert_p, key_p)
-        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER); ctx.load_cert_chain(str(cert_p), str(key_p))
-        return ctx, "https"
+            # just built: load from memory rather than reading the files straight back
+            return _ssl_context_from_pem(*_generate_self_signed(cert_p, key_p)), "https"
+        return _ssl_context_for(cert_p, key_p), "https"
     try:
-        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER); ctx.load_cert_chain(str(cert_p), str(key_p))
-        return ctx, "https"
+        return _ssl_context_for(cert_p, key_p), "https"
     except Exception as e:
         log(f"TLS config error ({mode}): {e}. Serving over HTTP.", "WARN"); return None, "http"
 
-def _port_is_free(host: str, port: int) -> bool:
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+def _bind_listen_socket(host: str, preferred: int) -> socket.socket:
+    """
+    Bind once and hand the socket to the server (no probe-then-rebind race).
+    Falls back to a kernel-assigned port when the preferred one is taken.
+    A wildcard bind becomes one dual-stack "::" socket (IPv4 arrives v4-mapped)
+    when the host supports it, so v4 and v6 share a single accept queue.
+    """
+    dual = host in ("0.0.0.0", "::", "") and socket.has_dualstack_ipv6()
+    s = socket.socket(socket.AF_INET6 if dual or ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    if dual:
+        s.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0); host = "::"
+    if os.name != "nt":   # on Windows SO_REUSEADDR would let two servers share the port
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if FORWARD_REUSEPORT:
+        if hasattr(socket, "SO_REUSEPORT"):
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)   # kernel spreads accepts across processes
+            if NKN_SEED_FILE == "sidecar/nkn.seed" and NKN_IDENTIFIER == "forwarder" and not _NKN_SEED_GIVEN:
+                log("FORWARD_REUSEPORT=1 with the default NKN_SEED_FILE/NKN_IDENTIFIER: every relay on this port "
+                    "gets the same NKN address and /forward replies can reach the wrong process. "
+                    "Give each process its own NKN_SEED, NKN_SEED_FILE or NKN_IDENTIFIER.", "WARN")
+        else:
+            log("FORWARD_REUSEPORT=1 but SO_REUSEPORT is not available here; ignoring.", "WARN")
     try:
-        s.bind((host, port)); s.close(); return True
+        s.bind((host, preferred))
     except OSError:
-        try: s.close()
-        except: pass
-        return False
+        log(f"Port {preferred} is busy; letting the OS pick one.", "WARN")
+        s.bind((host, 0))
+    s.listen(socket.SOMAXCONN)
+    return s
 
-def _find_free_port(host: str, preferred: int, tries: int=100) -> int:
-    for p in range(preferred, preferred+tries+1):
-        if _port_is_free(host, p): return p
-    raise RuntimeError(f"No free port in range {preferred}..{preferred+tries}")
+def _prewarm():
+    """Pay one-off first-use costs (route map build, JSON, decoders, numpy) before the first client does."""
+    try:
+        with app.test_client() as c: c.get("/healthz")
+        _decode_uncached(["u4pruydqq"] * _GH_BATCH_MIN)
+        _loads(_dumps({"results": []}))
+        _elev_url_prefix(ELEV_DATASET)
+    except Exception as e:
+        log(f"prewarm skipped: {e}", "WARN")
 
-_server_thread = None
+_server_close = None   # stops the running front end; set by _start_server
+_server_thread: Optional[threading.Thread] = None   # the front end's serve loop, joined on shutdown
 def _start_server():
-    global FORWARD_BIND
+    global FORWARD_BIND, _server_close, _server_thread
     if FORWARD_BIND in ("127.0.0.1","localhost","::1") and not FORWARD_FORCE_LOCAL:
         log("FORWARD_BIND was localhost; switching to 0.0.0.0 for LAN access. Set FORWARD_FORCE_LOCAL=1 to keep local-only.", "WARN")
         FORWARD_BIND = "0.0.0.0"
+    threading.Thread(target=_prewarm, daemon=True, name="prewarm").start()
     ssl_ctx, scheme = _build_ssl_context()
-    actual_port = _find_free_port(FORWARD_BIND, FORWARD_PORT, tries=100)
-    try:
-        from waitress import serve as _serve
-        threading.Thread(target=lambda: _serve(app, host=FORWARD_BIND, port=actual_port, threads=max(8, FORWARD_CONCURRENCY*2)), daemon=True).start()
-        log(f"Forwarder listening on {scheme}://{FORWARD_BIND}:{actual_port}", "SUCCESS")
-        try_host = "localhost" if FORWARD_BIND == "0.0.0.0" else FORWARD_BIND
-        curl_k = "-k " if scheme == "https" else ""
-        log(f"Try: curl {curl_k}-s {scheme}://{try_host}:{actual_port}/healthz | jq", "INFO")
-        return actual_port
-    except Exception as e:
-        log(f"waitress failed ({e}); falling back to Werkzeug.", "WARN")
-        class _ServerThread(threading.Thread):
-            def __init__(self, app, host, port, ssl_context=None):
-                super().__init__(daemon=True)
-                self._srv: BaseWSGIServer = make_server(host, port, app, ssl_context=ssl_context)
-                self.port=port
-            def run(self): self._srv.serve_forever()
-            def shutdown(self):
-                try: self._srv.shutdown()
-                except Exception: pass
-        st = _ServerThread(app, FORWARD_BIND, actual_port, ssl_context=ssl_ctx)
-        st.start()
-        globals()["_server_thread"]=st
-        log(f"Forwarder listening on {scheme}://{FORWARD_BIND}:{actual_port}", "SUCCESS")
-        return actual_port
-
-def _graceful_exit(signum=None, frame=None):
+    sock = _bind_listen_socket(FORWARD_BIND, FORWARD_PORT)
+    actual_port = sock.getsockname()[1]
+    if FORWARD_SERVER == "uvicorn":
+        try:
+            import uvicorn
+            # loop/http "auto" pick uvloop + httptools when installed. One worker only:
+            # the sidecar and the pending-reply table live in this process.
+            cfg = uvicorn.Config(_make_asgi_app(), host=FORWARD_BIND, port=actual_port, log_level="warning",
+                                 lifespan="on", loop="auto", http="auto")
+            cfg.load()
+            cfg.ssl = ssl_ctx   # reuse our (cached) context; uvicorn would only take file paths
+            userver = uvicorn.Server(cfg)
+            _server_thread = threading.Thread(target=userver.run, kwargs={"sockets": [sock]}, daemon=True, name="uvicorn"); _server_thread.start()
+            _server_close = lambda: setattr(userver, "should_exit", True)
+            log(f"Forwarder listening on {scheme}://{FORWARD_BIND}:{actual_port} (uvicorn, async /forward)", "SUCCESS")
+            return actual_port
+        except ImportError as e:
+            log(f"FORWARD_SERVER=uvicorn needs uvicorn + asgiref ({e}); try: pip install 'uvicorn[standard]' asgiref. Falling back to waitress.", "WARN")
+    if FORWARD_SERVER == "hypercorn":
+        try:
+            import asyncio
+            from hypercorn.config import Config as _HCConfig
+            from hypercorn.asyncio import serve as _hc_serve
+            class _Cfg(_HCConfig):
+                # hand hypercorn our (cached) context instead of cert paths
+                @property
+                def ssl_enabled(self) -> bool: return ssl_ctx is not None
+                def create_ssl_context(self): return ssl_ctx
+            cfg = _Cfg()
+            cfg.bind = [f"fd://{os.dup(sock.fileno())}"]
+            cfg.alpn_protocols = ["h2", "http/1.1"]   # h2 over TLS via ALPN, h2c prior-knowledge in the clear
+            if ssl_ctx is not None: ssl_ctx.set_alpn_protocols(cfg.alpn_protocols)
+            asgi = _make_asgi_app()
+            hloop = asyncio.new_event_loop()
+            hstop = hloop.create_future()
+            async def _until_stopped(): await hstop
+            def _run_hypercorn():
+                asyncio.set_event_loop(hloop)
+                hloop.run_until_complete(_hc_serve(asgi, cfg, shutdown_trigger=_until_stopped))
+            _server_thread = threading.Thread(target=_run_hypercorn, daemon=True, name="hypercorn"); _server_thread.start()
+            _server_close = lambda: hloop.call_soon_threadsafe(hstop.set_result, None)
+            log(f"Forwarder listening on {scheme}://{FORWARD_BIND}:{actual_port} (hypercorn, h2 + http/1.1)", "SUCCESS")
+            return actual_port
+        except ImportError as e:
+            log(f"FORWARD_SERVER=hypercorn needs hypercorn + asgiref ({e}); try: pip install hypercorn asgiref. Falling back to waitress.", "WARN")
+    if ssl_ctx is None:
+        try:
+            from waitress import create_server
+            # poll() instead of select() (no FD_SETSIZE cap), and ident="" drops the Server header
+            wsrv = create_server(app, sockets=[sock], threads=FORWARD_WAITRESS_THREADS,
+                                 connection_limit=FORWARD_WAITRESS_CONN_LIMIT, backlog=FORWARD_WAITRESS_BACKLOG,
+                                 channel_timeout=FORWARD_CHANNEL_TIMEOUT, asyncore_use_poll=True, ident="")
+            _server_thread = threading.Thread(target=wsrv.run, daemon=True, name="waitress"); _server_thread.start()
+            def _close_waitress():
+                wsrv.close()                       # stop accepting
+                wsrv.task_dispatcher.shutdown()    # let running requests finish (waitress caps the wait)
+            _server_close = _close_waitress
+            log(f"Forwarder listening on {scheme}://{FORWARD_BIND}:{actual_port}", "SUCCESS")
+            if _log_on("INFO"):
+                try_host = "localhost" if FORWARD_BIND == "0.0.0.0" else FORWARD_BIND
+                log(f"Try: curl -s {scheme}://{try_host}:{actual_port}/healthz | jq", "INFO")
+            return actual_port
+        except Exception as e:
+            log(f"waitress failed ({e}); falling back to Werkzeug.", "WARN")
+    else:
+        log("waitress can't terminate TLS; serving HTTPS with Werkzeug's threaded server (FORWARD_SERVER=uvicorn/hypercorn also do TLS).", "INFO")
+    srv: BaseWSGIServer = make_server(sock.getsockname()[0], actual_port, app, threaded=True, ssl_context=ssl_ctx, fd=sock.fileno())
+    _server_thread = threading.Thread(target=srv.serve_forever, daemon=True, name="werkzeug"); _server_thread.start()
+    _server_close = srv.shutdown
+    log(f"Forwarder listening on {scheme}://{FORWARD_BIND}:{actual_port}", "SUCCESS")
+    return actual_port
+
+_exit_lock = threading.Lock()   # held for good by whoever runs the shutdown
+_EXIT_GRACE_S = 8.0             # > waitress's 5s task drain; then we stop waiting
+
+def _shutdown():
+    if not _exit_lock.acquire(blocking=False): return   # already shutting down (atexit, repeated Ctrl+C)
+    # a second Ctrl+C / SIGTERM during cleanup kills the process outright
+    for _sn in ("SIGINT", "SIGTERM"):
+        try: signal.signal(getattr(signal, _sn), signal.SIG_DFL)
+        except ValueError: pass   # not on the main thread
     log("Shutting down…", "INFO")
+    # hard stop if a stuck request or upstream call would hold interpreter exit
+    watchdog = threading.Timer(_EXIT_GRACE_S, os._exit, args=(0,)); watchdog.daemon = True; watchdog.start()
+    if _server_close is not None:
+        try: _server_close()
+        except Exception: pass
+    # uvicorn/hypercorn only get told to stop; wait for in-flight requests to drain,
+    # keeping a second of the grace period for the sidecar
+    if _server_thread is not None and _server_thread is not threading.current_thread():
+        _server_thread.join(_EXIT_GRACE_S - 1.0)
     try: sidecar.close()
     except Exception: pass
-    os._exit(0)
+    # queued DMs/batches are dropped; exit still joins workers already running
+    for ex in (_DM_WORKERS, _batcher.pool):
+        ex.shutdown(wait=False, cancel_futures=True)
+
+def _graceful_exit(signum=None, frame=None):
+    _shutdown()
+    sys.exit(0)   # not os._exit: let atexit hooks run, bounded by the watchdog
 
 import atexit
-atexit.register(_graceful_exit)
+atexit.register(_shutdown)   # interpreter exit on other paths; no sys.exit inside atexit
 signal = _sig
-signal.signal(signal.SIGINT, _graceful_exit)
-signal.signal(signal.SIGTERM, _graceful_exit)
-if hasattr(signal, "SIGTSTP"):
-    signal.signal(signal.SIGTSTP, _graceful_exit)
+# Signals only wake the main thread: the interpreter's C-level handler writes the
+# signal number to this socketpair (async-signal-safe) and the Python handlers are
+# no-ops, so cleanup never runs inside a handler and a second Ctrl+C can't re-enter it.
+_wake_r, _wake_w = socket.socketpair()
+_wake_w.setblocking(False)
+signal.set_wakeup_fd(_wake_w.fileno())
+# SIGTSTP (Ctrl+Z) keeps its default job-control suspend
+for _sn in ("SIGINT", "SIGTERM"):
+    signal.signal(getattr(signal, _sn), lambda signum, frame: None)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 10) Main
 # ─────────────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
     _start_server()
-    try:
-        while True:
-            try:
-                signal.pause()
-            except AttributeError:
-                time.sleep(3600)
-    except KeyboardInterrupt:
-        _graceful_exit(signal.SIGINT, None)
+    _wake_r.recv(1)   # blocks until a signal arrives
+    _graceful_exit()